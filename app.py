@@ -5,14 +5,19 @@ Streamlit Webアプリケーション
 スマホ対応レイアウト
 """
 
+from pathlib import Path
+from typing import Tuple
+
 import streamlit as st
 import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
-from scipy import stats
 from statistics_utils import (
-    binomial_p_value,
+    binomial_p_values,
+    binomial_pmf_rows,
     calculate_relative_likelihood,
     evaluate_setting,
+    try_parse_probability,
 )
 
 # ページ設定
@@ -31,168 +36,65 @@ KOYAKU_COLORS = {
     "青": {"color": "#4169E1", "bg": "#F0F8FF", "icon": "🔵"},
 }
 
+# セッションステートの配列で使う色・設定の並び順
+COLOR_KEYS = tuple(KOYAKU_COLORS)
+SETTINGS = ("設定1", "設定2", "設定3", "設定4", "設定5", "設定6")
+
+# 描画ループ用に固定した (色名, 色情報) と、設定6〜1の降順の (インデックス, 設定名)
+_KOYAKU = tuple(KOYAKU_COLORS.items())
+_SETTING_ROWS = tuple((idx, SETTINGS[idx]) for idx in reversed(range(len(SETTINGS))))
+
+# 確率表の入力列（分母を入力）
+PROB_COLUMN = "1/"
+
+# グラフの設定別の線色と塗りつぶし色（SETTING_COLORS を透明度0.1にしたもの）
+SETTING_COLORS = [
+    '#FF6B6B', '#4ECDC4', '#45B7D1',
+    '#96CEB4', '#FFEAA7', '#DDA0DD'
+]
+SETTING_RGBA_FILLS = [
+    'rgba(255, 107, 107, 0.1)', 'rgba(78, 205, 196, 0.1)', 'rgba(69, 183, 209, 0.1)',
+    'rgba(150, 206, 180, 0.1)', 'rgba(255, 234, 167, 0.1)', 'rgba(221, 160, 221, 0.1)'
+]
+
+# 確率分布グラフの固定レイアウト（観測値の縦線以外は入力に依存しない）
+_DISTRIBUTION_LAYOUT = dict(
+    title="各設定の確率分布",
+    xaxis_title="出現回数",
+    yaxis_title="確率密度",
+    hovermode='x unified',
+    legend=dict(
+        orientation="h",
+        yanchor="bottom",
+        y=1.02,
+        xanchor="right",
+        x=1
+    ),
+    height=350,
+    margin=dict(t=80, l=50, r=20, b=50)
+)
+
+
+@st.cache_resource
+def _load_css() -> str:
+    """カスタムCSSを読み込む（ファイル読み込みはプロセスで1回だけ）"""
+    return (Path(__file__).parent / "assets" / "style.css").read_text(encoding="utf-8")
+
+
 # カスタムCSS（モバイル対応）
-st.markdown("""
-<style>
-    /* 全体のパディングを減らす */
-    .block-container {
-        padding-top: 1rem;
-        padding-left: 0.5rem;
-        padding-right: 0.5rem;
-    }
-    
-    .main-header {
-        font-size: 1.5rem;
-        font-weight: bold;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-align: center;
-        margin-bottom: 0.5rem;
-    }
-    
-    /* 4列カウンターを強制横並び */
-    [data-testid="stHorizontalBlock"]:has(.counter-box) {
-        display: flex !important;
-        flex-wrap: nowrap !important;
-        gap: 0.25rem !important;
-    }
-    
-    [data-testid="stHorizontalBlock"]:has(.counter-box) > [data-testid="stColumn"] {
-        flex: 1 1 0 !important;
-        min-width: 0 !important;
-        width: 25% !important;
-    }
-    
-    /* コンパクトなカウンターボックス */
-    .counter-box {
-        padding: 0.2rem;
-        border-radius: 8px;
-        text-align: center;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        min-width: 0;
-    }
-    
-    .counter-value {
-        font-size: 1.5rem;
-        font-weight: bold;
-        line-height: 1.1;
-    }
-    
-    .counter-icon {
-        font-size: 1rem;
-    }
-    
-    /* ボタンスタイル */
-    .stButton > button {
-        width: 100%;
-        padding: 0.2rem 0;
-        font-size: 1rem;
-        min-height: 36px;
-    }
-    
-    /* 判別結果 - ダークモード対策 */
-    .setting-result,
-    .setting-result * {
-        padding: 0.5rem 0.8rem;
-        border-radius: 8px;
-        margin: 0.3rem 0;
-        font-size: 0.9rem;
-        color: #333 !important;
-        -webkit-text-fill-color: #333 !important;
-    }
-    .setting-result * {
-        padding: 0;
-        margin: 0;
-    }
-    .setting-positive,
-    .setting-positive * {
-        background-color: #C8E6C9 !important;
-        border-left: 4px solid #4CAF50;
-        color: #1B5E20 !important;
-        -webkit-text-fill-color: #1B5E20 !important;
-    }
-    .setting-neutral,
-    .setting-neutral * {
-        background-color: #FFF9C4 !important;
-        border-left: 4px solid #FFC107;
-        color: #6D4C00 !important;
-        -webkit-text-fill-color: #6D4C00 !important;
-    }
-    .setting-negative,
-    .setting-negative * {
-        background-color: #FFCDD2 !important;
-        border-left: 4px solid #F44336;
-        color: #B71C1C !important;
-        -webkit-text-fill-color: #B71C1C !important;
-    }
-    
-    /* 確率入力行を強制横並び */
-    .prob-input-row {
-        display: flex;
-        align-items: center;
-        gap: 0.3rem;
-        margin: 0.2rem 0;
-    }
-    
-    /* 確率入力の3列も横並び強制 */
-    [data-testid="stHorizontalBlock"]:has([data-testid="stTextInput"]) {
-        display: flex !important;
-        flex-wrap: nowrap !important;
-        align-items: center !important;
-    }
-    
-    [data-testid="stHorizontalBlock"]:has([data-testid="stTextInput"]) > [data-testid="stColumn"] {
-        flex: 0 0 auto !important;
-        min-width: 0 !important;
-    }
-    
-    /* タブを画面幅いっぱいに等間隔で配置 */
-    .stTabs [data-baseweb="tab-list"] {
-        width: 100%;
-        display: flex !important;
-        justify-content: stretch !important;
-        gap: 0 !important;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        flex: 1 1 0 !important;
-        text-align: center;
-        font-size: 1rem;
-        padding: 0.6rem 0;
-        justify-content: center;
-    }
-    
-    /* 回転数入力の幅 */
-    .spin-input input {
-        font-size: 1rem;
-    }
-    
-    /* 小さい画面でのレスポンシブ対応 */
-    @media (max-width: 768px) {
-        .counter-value {
-            font-size: 1.3rem;
-        }
-        .counter-icon {
-            font-size: 0.9rem;
-        }
-        .stButton > button {
-            font-size: 0.9rem;
-            min-height: 32px;
-            padding: 0.15rem 0;
-        }
-        /* タブを小さく */
-        .stTabs [data-baseweb="tab"] {
-            font-size: 0.8rem;
-            padding: 0.4rem 0.5rem;
-        }
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(f"<style>{_load_css()}</style>", unsafe_allow_html=True)
+
+
+def parse_setting_probability(prob_str: str) -> float:
+    """確率入力をパース（解釈できない入力や0〜1の範囲外は0＝未設定）"""
+    p = try_parse_probability(prob_str)
+    return p if 0 < p <= 1 else 0.0
+
 
 # セッションステートの初期化
-if 'counts' not in st.session_state:
-    st.session_state.counts = {"黄": 0, "赤": 0, "緑": 0, "青": 0}
+if 'counts_arr' not in st.session_state:
+    # 各色の出現回数（COLOR_KEYS の順）
+    st.session_state.counts_arr = np.zeros(len(COLOR_KEYS), dtype=np.int64)
 
 if 'total_spins' not in st.session_state:
     st.session_state.total_spins = 1000
@@ -208,57 +110,126 @@ if 'probabilities' not in st.session_state:
         "設定6": "5.5"
     }
     st.session_state.probabilities = {
-        "黄": default_probs.copy(),
-        "赤": default_probs.copy(),
-        "緑": default_probs.copy(),
-        "青": default_probs.copy(),
+        color: default_probs.copy() for color in COLOR_KEYS
     }
 
+if 'probs_arr' not in st.session_state:
+    # パース済みの確率（色 × 設定、入力変更時のみ更新）
+    st.session_state.probs_arr = np.array([
+        [parse_setting_probability(st.session_state.probabilities[color][setting]) for setting in SETTINGS]
+        for color in COLOR_KEYS
+    ])
+
+if 'prob_frames' not in st.session_state:
+    # 確率表の元データ（設定6〜1の降順、編集内容はウィジェット側で保持）
+    st.session_state.prob_frames = [
+        pd.DataFrame({
+            "設定": [setting for _, setting in _SETTING_ROWS],
+            PROB_COLUMN: [st.session_state.probabilities[color][setting] for _, setting in _SETTING_ROWS],
+        })
+        for color in COLOR_KEYS
+    ]
+
 if 'analysis_results' not in st.session_state:
-    st.session_state.analysis_results = {"黄": None, "赤": None, "緑": None, "青": None}
+    st.session_state.analysis_results = [None] * len(COLOR_KEYS)
 
 
-def increment_count(color: str):
+def increment_count(color_idx: int):
     """指定色のカウントを1増やす"""
-    st.session_state.counts[color] += 1
+    st.session_state.counts_arr[color_idx] += 1
 
 
-def decrement_count(color: str):
+def decrement_count(color_idx: int):
     """指定色のカウントを1減らす（0未満にはならない）"""
-    if st.session_state.counts[color] > 0:
-        st.session_state.counts[color] -= 1
+    if st.session_state.counts_arr[color_idx] > 0:
+        st.session_state.counts_arr[color_idx] -= 1
 
 
 def reset_all_counts():
     """全てのカウントをリセット"""
-    for color in st.session_state.counts:
-        st.session_state.counts[color] = 0
+    st.session_state.counts_arr[:] = 0
+
+
+def update_probabilities(color_idx: int):
+    """確率表の編集を反映し、変更のあった行だけパース済みの確率配列を更新"""
+    color = COLOR_KEYS[color_idx]
+    editor_state = st.session_state.get(f"prob_{color}")
+    if editor_state is None:
+        return
+    edited_rows = editor_state["edited_rows"]
+    for row, changes in edited_rows.items():
+        if PROB_COLUMN not in changes:
+            continue
+        setting_idx, setting = _SETTING_ROWS[int(row)]
+        prob_str = changes[PROB_COLUMN] or ""
+        if st.session_state.probabilities[color][setting] == prob_str:
+            continue
+        st.session_state.probabilities[color][setting] = prob_str
+        st.session_state.probs_arr[color_idx, setting_idx] = parse_setting_probability(prob_str)
+
+
+def update_total_spins():
+    """総回転数の入力を反映（数値でない入力は無視）"""
+    spin_input = st.session_state.get("spin_input")
+    if spin_input is None:
+        return
+    try:
+        st.session_state.total_spins = int(spin_input) if spin_input else 1000
+    except ValueError:
+        pass
 
 
-def run_analysis(color: str, significance: float = 0.05):
+def run_analysis(color_idx: int, significance: float = 0.05):
     """指定色の分析を実行"""
-    probs = st.session_state.probabilities[color]
-    count = st.session_state.counts[color]
+    # 回転数・確率表の編集と分析ボタンが同じ再実行で届いた場合も
+    # コールバックの実行順に依存しないよう、ここで入力を反映してから分析する
+    # （どちらも変更のない値は書き換えないので2回呼ばれても問題ない）
+    update_total_spins()
+    update_probabilities(color_idx)
+    
+    probs = tuple(st.session_state.probs_arr[color_idx].tolist())
+    count = int(st.session_state.counts_arr[color_idx])
     n = st.session_state.total_spins
     
-    # 確率をパース
-    parsed_probs = {}
-    for setting, prob_str in probs.items():
-        try:
-            denominator = float(prob_str)
-            parsed_probs[setting] = 1.0 / denominator if denominator > 0 else 0
-        except (ValueError, ZeroDivisionError):
-            parsed_probs[setting] = 0
+    # 前回の分析から入力が変わっていなければ何もしない
+    key = (count, n, probs, significance)
+    previous = st.session_state.analysis_results[color_idx]
+    if previous is not None and previous.get("_key") == key:
+        return
+    
+    result = _analyze(n, count, probs, significance)
+    result["_key"] = key
+    st.session_state.analysis_results[color_idx] = result
+
+
+@st.cache_data(max_entries=64)
+def _analyze(n: int, count: int, probs: Tuple[float, ...], significance: float) -> dict:
+    """
+    分析の計算本体（入力が同じならキャッシュ済みの結果を返す）
+    
+    Args:
+        n: 総回転数
+        count: 小役出現回数
+        probs: SETTINGS の順に並べたパース済みの確率
+        significance: 有意水準
+    
+    Returns:
+        分析結果の辞書
+    """
+    prob_arr = np.array(probs)
+    parsed_probs = dict(zip(SETTINGS, probs))
     
     # 尤度計算
-    prob_list = list(parsed_probs.values())
-    relative_likelihoods = calculate_relative_likelihood(n, count, prob_list)
+    relative_likelihoods = calculate_relative_likelihood(n, count, prob_arr)
+    
+    # p値を全設定まとめて計算
+    p_values = binomial_p_values(n, count, prob_arr)
     
     # 各設定の結果を計算（元の順番を維持）
     results = []
     for i, (setting, p) in enumerate(parsed_probs.items()):
         if p > 0:
-            p_value = binomial_p_value(n, count, p)
+            p_value = float(p_values[i])
             symbol, eval_text = evaluate_setting(p_value, significance)
             likelihood_pct = relative_likelihoods[i] * 100
         else:
@@ -278,80 +249,77 @@ def run_analysis(color: str, significance: float = 0.05):
     
     # 設定6〜1の降順にソート
     results.sort(key=lambda x: int(x["setting"].replace("設定", "")), reverse=True)
-    st.session_state.analysis_results[color] = {
+    return {
         "results": results,
+        "likelihoods_arr": np.array([r["likelihood"] for r in results]),
         "parsed_probs": parsed_probs,
         "count": count,
         "total_spins": n
     }
 
 
-def generate_probability_distribution_graph(parsed_probs: dict, n: int, observed_count: int, color_info: dict):
+@st.cache_data(max_entries=32)
+def generate_probability_distribution_graph(parsed_probs: dict, n: int, observed_count: int, color_hex: str):
     """
     X軸: 出現回数、Y軸: 各設定の確率密度（二項分布のPMF）
+    入力が同じ再実行ではキャッシュ済みの図を返す
     """
-    fig = go.Figure()
-    
-    setting_colors = [
-        '#FF6B6B', '#4ECDC4', '#45B7D1', 
-        '#96CEB4', '#FFEAA7', '#DDA0DD'
-    ]
-    
-    # X軸の範囲を決定
-    # 全設定の平均を考慮して範囲を設定
-    all_means = [p * n for p in parsed_probs.values() if p > 0]
-    if all_means:
-        center = np.mean(all_means)
-        # 標準偏差の4倍程度の範囲
-        max_std = max(np.sqrt(p * (1-p) * n) for p in parsed_probs.values() if p > 0)
+    # 描画する設定（確率が設定済みのもの）と、その元の並び順
+    plotted = [(i, setting) for i, (setting, p) in enumerate(parsed_probs.items()) if p > 0]
+    ps = np.fromiter((p for p in parsed_probs.values() if p > 0), dtype=np.float64)
+    
+    traces = []
+    if ps.size:
+        means = ps * n
+        stds = np.sqrt(ps * (1 - ps) * n)
+        
+        # X軸の範囲を決定
+        # 全設定の平均を考慮して範囲を設定（標準偏差の4倍程度）
+        center = means.mean()
+        max_std = stds.max()
         x_min = max(0, int(center - 4 * max_std))
         x_max = int(center + 4 * max_std)
-    else:
-        x_min, x_max = 0, n
-    
-    x_values = np.arange(x_min, x_max + 1)
-    
-    # 各設定の確率分布を描画
-    for i, (setting, p) in enumerate(parsed_probs.items()):
-        if p > 0:
-            # 二項分布の確率質量関数
-            pmf = stats.binom.pmf(x_values, n, p)
-            
-            fig.add_trace(go.Scatter(
-                x=x_values,
-                y=pmf,
+        
+        # 各設定は自身の平均±4σだけを計算（全体の範囲でクリップ）
+        starts = np.clip(np.floor(means - 4 * stds), x_min, x_max).astype(np.int64)
+        ends = np.clip(np.ceil(means + 4 * stds), x_min, x_max).astype(np.int64)
+        widths = ends - starts + 1
+        
+        # 全設定の二項分布PMFを (設定数, 最大幅) の2次元配列で一括計算
+        pmf_rows = binomial_pmf_rows(starts, int(widths.max()), n, ps)
+        
+        # 各設定の確率分布（トレースごとに異なるx範囲）
+        for row, (i, setting) in enumerate(plotted):
+            traces.append(dict(
+                type='scatter',
+                x=np.arange(starts[row], ends[row] + 1),
+                y=pmf_rows[row, :widths[row]],
                 name=setting,
-                line=dict(color=setting_colors[i % len(setting_colors)], width=2),
+                line=dict(color=SETTING_COLORS[i % len(SETTING_COLORS)], width=2),
                 mode='lines',
                 fill='tozeroy',
-                fillcolor=f'rgba{tuple(list(int(setting_colors[i % len(setting_colors)].lstrip("#")[j:j+2], 16) for j in (0, 2, 4)) + [0.1])}'
+                fillcolor=SETTING_RGBA_FILLS[i % len(SETTING_RGBA_FILLS)]
             ))
     
-    # 観測値をマーク
-    fig.add_vline(
-        x=observed_count,
-        line=dict(color=color_info["color"], width=3, dash="dash"),
-        annotation_text=f"観測値: {observed_count}",
-        annotation_position="top"
-    )
-    
-    fig.update_layout(
-        title="各設定の確率分布",
-        xaxis_title="出現回数",
-        yaxis_title="確率密度",
-        hovermode='x unified',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        height=350,
-        margin=dict(t=80, l=50, r=20, b=50)
+    # 観測値をマーク（add_vline と同じ縦線と注釈）
+    layout = dict(
+        _DISTRIBUTION_LAYOUT,
+        shapes=[dict(
+            type='line',
+            x0=observed_count, x1=observed_count, xref='x',
+            y0=0, y1=1, yref='y domain',
+            line=dict(color=color_hex, width=3, dash="dash")
+        )],
+        annotations=[dict(
+            text=f"観測値: {observed_count}",
+            x=observed_count, xref='x', xanchor='center',
+            y=1, yref='y domain', yanchor='bottom',
+            showarrow=False
+        )]
     )
     
-    return fig
+    # トレースとレイアウトを1回の生成でまとめて渡す
+    return go.Figure(data=traces, layout=layout)
 
 
 def main():
@@ -364,96 +332,86 @@ def main():
     with spin_cols[0]:
         st.markdown("<div style='line-height:38px;'>総回転数:</div>", unsafe_allow_html=True)
     with spin_cols[1]:
-        spin_input = st.text_input(
+        st.text_input(
             "総回転数",
             value=str(st.session_state.total_spins),
             key="spin_input",
-            label_visibility="collapsed"
+            label_visibility="collapsed",
+            on_change=update_total_spins
         )
-        try:
-            st.session_state.total_spins = int(spin_input) if spin_input else 1000
-        except ValueError:
-            pass
     
     # 4色のカウンター（横並び、コンパクト）
     cols = st.columns(4, gap="small")
     
-    for i, (color_key, color_info) in enumerate(KOYAKU_COLORS.items()):
+    for i, (color_key, color_info) in enumerate(_KOYAKU):
         with cols[i]:
             # ＋ボタン（上）
-            if st.button("➕", key=f"inc_{color_key}", use_container_width=True, type="primary"):
-                increment_count(color_key)
-                st.rerun()
+            # on_click は再実行の前に呼ばれるので、同じ実行内で最新のカウントが表示される
+            st.button(
+                "➕",
+                key=f"inc_{color_key}",
+                use_container_width=True,
+                type="primary",
+                on_click=increment_count,
+                args=(i,)
+            )
             
             # カウンター表示
             st.markdown(
                 f"""<div class="counter-box" style="background-color: {color_info['bg']}; border: 2px solid {color_info['color']};">
                     <div class="counter-icon">{color_info['icon']}</div>
-                    <div class="counter-value" style="color: {color_info['color']};">{st.session_state.counts[color_key]}</div>
+                    <div class="counter-value" style="color: {color_info['color']};">{st.session_state.counts_arr[i]}</div>
                 </div>""",
                 unsafe_allow_html=True
             )
             
             # ーボタン（下）
-            if st.button("➖", key=f"dec_{color_key}", use_container_width=True):
-                decrement_count(color_key)
-                st.rerun()
+            st.button(
+                "➖",
+                key=f"dec_{color_key}",
+                use_container_width=True,
+                on_click=decrement_count,
+                args=(i,)
+            )
     
     # 全リセットボタン（カウンターの下）
-    if st.button("🗑️ 全リセット", use_container_width=True):
-        reset_all_counts()
-        st.rerun()
+    st.button("🗑️ 全リセット", use_container_width=True, on_click=reset_all_counts)
     
     st.divider()
     
     # ====== 分析タブセクション ======
-    tab_yellow, tab_red, tab_green, tab_blue = st.tabs([
-        "🟡 黄", "🔴 赤", "🟢 緑", "🔵 青"
-    ])
-    
-    tabs = [
-        (tab_yellow, "黄"),
-        (tab_red, "赤"),
-        (tab_green, "緑"),
-        (tab_blue, "青")
-    ]
+    tabs = st.tabs([f"{color_info['icon']} {color_key}" for color_key, color_info in _KOYAKU])
     
-    for tab, color_key in tabs:
-        with tab:
-            color_info = KOYAKU_COLORS[color_key]
-            
+    for color_idx, (color_key, color_info) in enumerate(_KOYAKU):
+        with tabs[color_idx]:
             # 確率入力セクション
             st.subheader(f"{color_info['icon']} 確率設定")
             
-            # 1行ずつ表示、設定6〜1の降順
-            settings = ["設定6", "設定5", "設定4", "設定3", "設定2", "設定1"]
-            
-            for setting in settings:
-                sub_cols = st.columns([1.2, 0.5, 1.3])
-                with sub_cols[0]:
-                    st.markdown(f"<div style='line-height:38px;'><b>{setting}</b></div>", unsafe_allow_html=True)
-                with sub_cols[1]:
-                    st.markdown("<div style='line-height:38px; text-align:right;'>1/</div>", unsafe_allow_html=True)
-                with sub_cols[2]:
-                    st.session_state.probabilities[color_key][setting] = st.text_input(
-                        f"{setting}",
-                        value=st.session_state.probabilities[color_key][setting],
-                        key=f"prob_{color_key}_{setting}",
-                        label_visibility="collapsed"
-                    )
+            # 設定6〜1の降順の表で一括編集（変更された行だけ反映）
+            st.data_editor(
+                st.session_state.prob_frames[color_idx],
+                key=f"prob_{color_key}",
+                use_container_width=True,
+                hide_index=True,
+                num_rows="fixed",
+                disabled=["設定"],
+                column_config={PROB_COLUMN: st.column_config.TextColumn(PROB_COLUMN)},
+                on_change=update_probabilities,
+                args=(color_idx,)
+            )
             
             # 分析ボタン
-            if st.button(
+            st.button(
                 f"🔍 分析",
                 key=f"analyze_{color_key}",
                 type="primary",
-                use_container_width=True
-            ):
-                run_analysis(color_key)
-                st.rerun()
+                use_container_width=True,
+                on_click=run_analysis,
+                args=(color_idx,)
+            )
             
             # 分析結果表示
-            analysis = st.session_state.analysis_results[color_key]
+            analysis = st.session_state.analysis_results[color_idx]
             
             if analysis is not None:
                 st.divider()
@@ -485,7 +443,7 @@ def main():
                     )
                 
                 # 最も可能性の高い設定を表示
-                best = max(analysis["results"], key=lambda x: x["likelihood"])
+                best = analysis["results"][int(np.argmax(analysis["likelihoods_arr"]))]
                 st.success(f"📍 最も可能性が高い: **{best['setting']}** ({best['likelihood']:.1f}%)")
                 
                 # グラフ表示
@@ -494,7 +452,7 @@ def main():
                     analysis["parsed_probs"],
                     analysis["total_spins"],
                     analysis["count"],
-                    color_info
+                    color_info["color"]
                 )
                 st.plotly_chart(fig, use_container_width=True)
 
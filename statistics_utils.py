@@ -3,9 +3,23 @@
 パチスロ設定判別のための統計計算を提供
 """
 
+import functools
+import math
+import re
+
 import numpy as np
-from scipy import stats
-from typing import List, Tuple, Dict
+from scipy import special, stats
+from typing import List, Tuple, Dict, Union
+
+# 呼び出しごとの属性参照を避けるため、使用する関数をモジュール読み込み時に束縛
+# （正規分布の分位点は norm.ppf の実体である ndtri を直接使う）
+_binom_pmf = stats.binom.pmf
+_norm_ppf = special.ndtri
+_gammaln = special.gammaln
+_xlogy = special.xlogy
+_xlog1py = special.xlog1py
+_bdtr = special.bdtr
+_bdtrc = special.bdtrc
 
 
 def binomial_p_value(n: int, k: int, p: float) -> float:
@@ -20,12 +34,89 @@ def binomial_p_value(n: int, k: int, p: float) -> float:
     Returns:
         p値（両側検定）
     """
-    if n <= 0 or p <= 0 or p >= 1:
-        return 1.0
+    return float(binomial_p_values(n, k, np.array([p]))[0])
+
+
+def binomial_p_values(n: int, k: int, probs: np.ndarray) -> np.ndarray:
+    """
+    複数の確率に対する二項検定のp値をまとめて計算（両側検定）
+    
+    binomtest と同じ point probability 法（観測値の確率 d 以下の確率を持つ
+    点の質量を合計）を、全設定分の配列に対して一括で計算する
+    
+    Args:
+        n: 試行回数（総回転数）
+        k: 成功回数（小役出現回数）
+        probs: 各設定の理論上の成功確率の配列
+    
+    Returns:
+        p値の配列（範囲外の確率は1.0）
+    """
+    probs = np.asarray(probs, dtype=np.float64)
+    p_values = np.ones_like(probs)
+    
+    valid = (probs > 0) & (probs < 1)
+    if n <= 0 or not valid.any():
+        return p_values
+    
+    p = probs[valid]
+    mean = n * p
+    # 比較は対数PMFで行う（log(d * (1 + 1e-7)) = log d + log1p(1e-7)）
+    log_threshold = _binom_logpmf(k, n, p) + np.log1p(1e-7)
+    
+    # 観測値が平均より下なら上側の裾、上なら下側の裾で境界を二分探索
+    lower_side = k < mean
+    lo = np.where(lower_side, np.ceil(mean), 0).astype(np.int64)
+    hi = np.where(lower_side, n, np.floor(mean)).astype(np.int64)
+    
+    for _ in range(int(n).bit_length() + 1):
+        active = lo <= hi
+        if not active.any():
+            break
+        mid = (lo + hi) // 2
+        below = _binom_logpmf(mid, n, p) <= log_threshold
+        # 上側の裾は単調減少、下側の裾は単調増加
+        move_hi = active & (below == lower_side)
+        move_lo = active & ~move_hi
+        hi = np.where(move_hi, mid - 1, hi)
+        lo = np.where(move_lo, mid + 1, lo)
     
-    # 二項検定（両側）
-    result = stats.binomtest(k, n, p, alternative='two-sided')
-    return result.pvalue
+    pval = np.where(
+        lower_side,
+        _binom_cdf(k, n, p) + _binom_sf(lo - 1, n, p),
+        _binom_cdf(hi, n, p) + _binom_sf(k - 1, n, p),
+    )
+    
+    # 最頻値ちょうどなら全ての点が d 以下の確率なので p値は1
+    at_mode = k == np.floor((n + 1) * p)
+    p_values[valid] = np.where(at_mode, 1.0, np.minimum(1.0, pval))
+    return p_values
+
+
+def _binom_logpmf(k, n: int, p):
+    """
+    二項分布の対数PMFを scipy.special の ufunc で直接計算
+    
+    log C(n, k) + k log p + (n - k) log(1 - p)。範囲外の k は -inf
+    """
+    k = np.asarray(k)
+    in_range = (k >= 0) & (k <= n)
+    kc = np.clip(k, 0, n)
+    logpmf = (_gammaln(n + 1) - _gammaln(kc + 1) - _gammaln(n - kc + 1)
+              + _xlogy(kc, p) + _xlog1py(n - kc, -p))
+    return np.where(in_range, logpmf, -np.inf)
+
+
+def _binom_cdf(x, n: int, p):
+    """二項分布の累積分布 P(X <= x)（x < 0 は0、x >= n は1）"""
+    x = np.asarray(x)
+    return np.where(x < 0, 0.0, _bdtr(np.clip(x, 0, n), n, p))
+
+
+def _binom_sf(x, n: int, p):
+    """二項分布の生存関数 P(X > x)（x < 0 は1、x >= n は0）"""
+    x = np.asarray(x)
+    return np.where(x < 0, 1.0, _bdtrc(np.clip(x, 0, n), n, p))
 
 
 def calculate_likelihood(n: int, k: int, p: float) -> float:
@@ -43,30 +134,86 @@ def calculate_likelihood(n: int, k: int, p: float) -> float:
     if n <= 0 or p <= 0 or p >= 1:
         return 0.0
     
-    # 二項分布の確率質量関数
-    likelihood = stats.binom.pmf(k, n, p)
-    return likelihood
+    # 二項分布の確率質量関数（対数PMFから計算）
+    return float(np.exp(_binom_logpmf(k, n, p)))
 
 
-def calculate_relative_likelihood(n: int, k: int, probabilities: List[float]) -> List[float]:
+def calculate_relative_likelihood(n: int, k: int, probabilities: Union[List[float], np.ndarray]) -> List[float]:
     """
     各設定の相対尤度を計算（正規化）
     
     Args:
         n: 試行回数
         k: 成功回数
-        probabilities: 各設定の確率リスト
+        probabilities: 各設定の確率のリストまたは配列
     
     Returns:
         正規化された尤度リスト（合計1.0）
     """
-    likelihoods = [calculate_likelihood(n, k, p) for p in probabilities]
-    total = sum(likelihoods)
+    p_arr = np.asarray(probabilities, dtype=np.float64)
+    
+    # 6設定分の対数尤度を一括計算（範囲外の確率は尤度0 = -inf）
+    log_likelihoods = np.full_like(p_arr, -np.inf)
+    if n > 0:
+        valid = (p_arr > 0) & (p_arr < 1)
+        log_likelihoods[valid] = _binom_logpmf(k, n, p_arr[valid])
+    
+    max_log = log_likelihoods.max(initial=-np.inf)
+    if not np.isfinite(max_log):
+        return [1.0 / len(p_arr)] * len(p_arr)
+    
+    # 最大値を引いてから exp することで、回転数が大きくてもアンダーフローしない
+    likelihoods = np.exp(log_likelihoods - max_log)
+    return (likelihoods / likelihoods.sum()).tolist()
+
+
+def binomial_pmf_rows(x_starts: np.ndarray, width: int, n: int, probs: np.ndarray) -> np.ndarray:
+    """
+    行ごとに開始位置の異なる範囲で二項分布PMFを2次元配列で一括計算
+    
+    行 i は x_starts[i]〜x_starts[i] + width - 1 のPMF。
+    各行の最頻値で1点だけPMFを求め、そこから
+    P(x+1) = P(x) * p(n-x) / ((1-p)(x+1)) を np.multiply.accumulate で
+    前後に展開する（裾でのアンダーフローを避けるため最頻値を起点にする）
+    
+    Args:
+        x_starts: 各行の範囲の下限（長さ m）
+        width: 各行の点数
+        n: 試行回数
+        probs: 確率の配列（長さ m）
+    
+    Returns:
+        形状 (m, width) のPMF配列
+    """
+    probs = np.asarray(probs, dtype=np.float64)
+    x = np.asarray(x_starts, dtype=np.int64)[:, None] + np.arange(width)[None, :]
+    pmf = np.zeros(x.shape)
+    
+    valid = (probs > 0) & (probs < 1)
+    if not valid.all():
+        pmf[~valid] = _binom_pmf(x[~valid], n, probs[~valid][:, None])
+    if width <= 0 or not valid.any():
+        return pmf
+    
+    x = x[valid]
+    p = probs[valid][:, None]
+    odds = p / (1 - p)
+    # 起点は各行の範囲内（かつ 0〜n）の最頻値に最も近い点
+    lo = np.maximum(x[:, :1], 0)
+    hi = np.minimum(x[:, -1:], n)
+    mode = np.clip(np.floor((n + 1) * p), lo, hi)
+    seed = _binom_pmf(mode, n, p)
+    
+    # 前方: P(x) / P(x-1)（最頻値以下は1、n を超えると0）
+    forward = np.where(x > mode, odds * np.maximum(n - x + 1, 0) / np.maximum(x, 1), 1.0)
+    # 後方: P(x) / P(x+1)（最頻値以上は1）
+    backward = np.where(x < mode, np.maximum(x + 1, 0) / (odds * np.maximum(n - x, 1)), 1.0)
     
-    if total == 0:
-        return [1.0 / len(probabilities)] * len(probabilities)
+    forward = np.multiply.accumulate(forward, axis=1)
+    backward = np.multiply.accumulate(backward[:, ::-1], axis=1)[:, ::-1]
     
-    return [l / total for l in likelihoods]
+    pmf[valid] = seed * forward * backward
+    return pmf
 
 
 def get_confidence_interval(p: float, n: int, confidence: float = 0.95) -> Tuple[float, float]:
@@ -85,7 +232,7 @@ def get_confidence_interval(p: float, n: int, confidence: float = 0.95) -> Tuple
         return (0.0, 1.0)
     
     # 正規近似による信頼区間
-    z = stats.norm.ppf((1 + confidence) / 2)
+    z = _norm_ppf((1 + confidence) / 2)
     se = np.sqrt(p * (1 - p) / n)
     
     lower = max(0, p - z * se)
@@ -126,29 +273,29 @@ def generate_probability_curve_data(
     Returns:
         グラフ描画用データ
     """
-    n_values = list(range(step, max_n + 1, step))
-    if max_n not in n_values:
-        n_values.append(max_n)
+    n_arr = np.arange(step, max_n + 1, step)
+    if n_arr.size == 0 or n_arr[-1] != max_n:
+        n_arr = np.append(n_arr, max_n)
     
     result = {
-        "n_values": n_values,
+        "n_values": n_arr.tolist(),
         "curves": {}
     }
     
+    # 95%信頼区間のz値（nに依存しないのでループの外で1回だけ計算）
+    z = _norm_ppf((1 + 0.95) / 2)
+    
+    # n <= 0 では区間を (0, 1) とする（get_confidence_interval と同じ扱い）
+    positive = n_arr > 0
+    safe_n = np.where(positive, n_arr, np.inf)
+    
     for setting_name, p in probabilities.items():
-        expected = [p * n for n in n_values]
-        lower_bounds = []
-        upper_bounds = []
-        
-        for n in n_values:
-            lower, upper = get_expected_count_range(p, n, 0.95)
-            lower_bounds.append(lower)
-            upper_bounds.append(upper)
+        se = np.sqrt(p * (1 - p) / safe_n)
         
         result["curves"][setting_name] = {
-            "expected": expected,
-            "lower": lower_bounds,
-            "upper": upper_bounds
+            "expected": (p * n_arr).tolist(),
+            "lower": (np.where(positive, np.maximum(0.0, p - z * se), 0.0) * n_arr).tolist(),
+            "upper": (np.where(positive, np.minimum(1.0, p + z * se), 1.0) * n_arr).tolist()
         }
     
     return result
@@ -175,34 +322,66 @@ def evaluate_setting(p_value: float, significance: float = 0.05) -> Tuple[str, s
         return ("◎", "高い可能性")
 
 
-def parse_probability_input(input_str: str) -> float:
+# 符号・小数点・指数表記を含む数値（float() で必ず解釈できるもの）
+_NUMBER_RE = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+
+def _to_float(text: str) -> float:
+    """数値として解釈できれば float、できなければ NaN を返す"""
+    text = text.strip()
+    if _NUMBER_RE.fullmatch(text):
+        return float(text)
+    return math.nan
+
+
+@functools.lru_cache(maxsize=256)
+def try_parse_probability(input_str: str) -> float:
     """
-    確率入力をパース（分数または小数対応）
+    確率入力をパース（例外を使わない版、結果はキャッシュ）
     
     Args:
-        input_str: "1/6.5" または "0.1538" または "15.38%"
+        input_str: "1/6.5" または "0.1538" または "15.38%" または "6.5"
     
     Returns:
-        確率（0-1の範囲）
+        確率（0-1の範囲）、解釈できない場合はNaN
     """
     input_str = input_str.strip()
     
     # パーセント表記
     if input_str.endswith('%'):
-        return float(input_str[:-1]) / 100
+        return _to_float(input_str[:-1]) / 100
     
     # 分数表記 "1/X"
     if '/' in input_str:
         parts = input_str.split('/')
-        if len(parts) == 2:
-            numerator = float(parts[0])
-            denominator = float(parts[1])
-            if denominator != 0:
-                return numerator / denominator
-    
-    # 小数表記
-    value = float(input_str)
-    # 1より大きい場合は分母として扱う
+        if len(parts) != 2:
+            return math.nan
+        denominator = _to_float(parts[1])
+        if denominator == 0:
+            return math.nan
+        return _to_float(parts[0]) / denominator
+    
+    # 小数表記（1より大きい場合は分母として扱う）
+    value = _to_float(input_str)
     if value > 1:
         return 1 / value
     return value
+
+
+def parse_probability_input(input_str: str) -> float:
+    """
+    確率入力をパース（分数または小数対応）
+    
+    Args:
+        input_str: "1/6.5" または "0.1538" または "15.38%"
+    
+    Returns:
+        確率（0-1の範囲）
+    
+    Raises:
+        ValueError: 確率として解釈できない場合
+    """
+    value = try_parse_probability(input_str)
+    if math.isnan(value):
+        raise ValueError(f"could not parse probability: {input_str!r}")
+    return value